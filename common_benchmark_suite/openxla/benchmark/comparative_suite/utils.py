@@ -8,7 +8,9 @@
 import string
 import dataclasses
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+import functools
+from typing import (Any, Callable, Dict, List, Optional, Sequence, Tuple, Type,
+                    Union)
 
 from openxla.benchmark import def_types, testdata
 
@@ -52,6 +54,51 @@ class ModelTemplate:
       default_factory=list)
 
 
+@functools.lru_cache(maxsize=None)
+def _split_template(
+    template_type: Type[string.Template],
+    template: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+  """Split a template string into literals and placeholder names.
+
+  The placeholders are parsed once, so realizing a template only needs to join
+  the literals with the substituted values.
+
+  Returns:
+    Tuple of (literals, names). The literals are one more than the names and
+    interleave with them.
+  """
+
+  literals = [""]
+  names = []
+  pos = 0
+  for match in template_type.pattern.finditer(template):
+    literals[-1] += template[pos:match.start()]
+    pos = match.end()
+    if match.group("escaped") is not None:
+      literals[-1] += template_type.delimiter
+      continue
+    name = match.group("named") or match.group("braced")
+    if name is None:
+      raise ValueError(f"Invalid placeholder in template: '{template}'.")
+    names.append(name)
+    literals.append("")
+  literals[-1] += template[pos:]
+
+  return tuple(literals), tuple(names)
+
+
+def _realize_template(template: string.Template,
+                      substitutions: Dict[str, Any]) -> str:
+  """Same as `template.substitute(substitutions)` with pre-split templates."""
+
+  literals, names = _split_template(type(template), template.template)
+  parts = [literals[0]]
+  for name, literal in zip(names, literals[1:]):
+    parts.append(str(substitutions[name]))
+    parts.append(literal)
+  return "".join(parts)
+
+
 def _substitute_template(obj: Any, **substitutions) -> Any:
   """Recursively substitute `string.Template` in an object.
 
@@ -61,12 +108,10 @@ def _substitute_template(obj: Any, **substitutions) -> Any:
   if isinstance(obj, TemplateFunc):
     return obj.func(**substitutions)
 
-  if obj is None or any(
-      isinstance(obj, primitive_type)
-      for primitive_type in [int, float, str, bool]):
+  if obj is None or isinstance(obj, (int, float, str, bool)):
     return obj
   if isinstance(obj, string.Template):
-    return obj.substitute(**substitutions)
+    return _realize_template(obj, substitutions)
   if isinstance(obj, list):
     return [_substitute_template(value, **substitutions) for value in obj]
   if isinstance(obj, dict):
@@ -76,6 +121,29 @@ def _substitute_template(obj: Any, **substitutions) -> Any:
   raise ValueError(f"Unsupported object type: {type(obj)} of {obj}.")
 
 
+def _build_models(template: ModelTemplate, param_name: str,
+                  param_values: Sequence[int]) -> Dict[int, def_types.Model]:
+  """Build models by replacing `${<param_name>}`, `${name}` in the template."""
+
+  models = {}
+  for value in param_values:
+    substitutions = {param_name: value}
+    name = _substitute_template(obj=template.name, **substitutions)
+    substitutions["name"] = name
+    models[value] = def_types.Model(
+        name=name,
+        tags=_substitute_template(obj=template.tags, **substitutions),
+        model_impl=template.model_impl,
+        model_parameters=_substitute_template(obj=template.model_parameters,
+                                              **substitutions),
+        exported_model_types=template.exported_model_types,
+        artifacts_dir_url=_substitute_template(obj=template.artifacts_dir_url,
+                                               **substitutions),
+    )
+
+  return models
+
+
 def build_batch_models(
     template: ModelTemplate,
     batch_sizes: Sequence[int]) -> Dict[int, def_types.Model]:
@@ -93,22 +161,9 @@ def build_batch_models(
     Map of batch size to model.
   """
 
-  batch_models = {}
-  for batch_size in batch_sizes:
-    name = _substitute_template(obj=template.name, batch_size=batch_size)
-    substitute = lambda obj: _substitute_template(
-        obj=obj, batch_size=batch_size, name=name)
-    model = def_types.Model(
-        name=substitute(template.name),
-        tags=substitute(template.tags),
-        model_impl=template.model_impl,
-        model_parameters=substitute(template.model_parameters),
-        exported_model_types=template.exported_model_types,
-        artifacts_dir_url=substitute(template.artifacts_dir_url),
-    )
-    batch_models[batch_size] = model
-
-  return batch_models
+  return _build_models(template=template,
+                       param_name="batch_size",
+                       param_values=batch_sizes)
 
 
 def build_gen_models(template: ModelTemplate,
@@ -127,22 +182,9 @@ def build_gen_models(template: ModelTemplate,
     Map of gen size to model.
   """
 
-  gen_models = {}
-  for gen_size in gen_sizes:
-    name = _substitute_template(obj=template.name, gen_size=gen_size)
-    substitute = lambda obj: _substitute_template(
-        obj=obj, gen_size=gen_size, name=name)
-    model = def_types.Model(
-        name=substitute(template.name),
-        tags=substitute(template.tags),
-        model_impl=template.model_impl,
-        model_parameters=substitute(template.model_parameters),
-        exported_model_types=template.exported_model_types,
-        artifacts_dir_url=substitute(template.artifacts_dir_url),
-    )
-    gen_models[gen_size] = model
-
-  return gen_models
+  return _build_models(template=template,
+                       param_name="gen_size",
+                       param_values=gen_sizes)
 
 
 def build_input_sequence_models(
@@ -158,22 +200,9 @@ def build_input_sequence_models(
   Returns:
     Map of input sequence length to model.
   """
-  model_map = {}
-  for input_sequence in input_sequence_lengths:
-    name = _substitute_template(obj=template.name, seq_len=input_sequence)
-    substitute = lambda obj: _substitute_template(
-        obj=obj, seq_len=input_sequence, name=name)
-    model = def_types.Model(
-        name=substitute(template.name),
-        tags=substitute(template.tags),
-        model_impl=template.model_impl,
-        model_parameters=substitute(template.model_parameters),
-        exported_model_types=template.exported_model_types,
-        artifacts_dir_url=substitute(template.artifacts_dir_url),
-    )
-    model_map[input_sequence] = model
-
-  return model_map
+  return _build_models(template=template,
+                       param_name="seq_len",
+                       param_values=input_sequence_lengths)
 
 
 def build_gen_benchmark_cases(
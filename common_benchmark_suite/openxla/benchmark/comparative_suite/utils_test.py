@@ -113,6 +113,25 @@ class UtilsTest(unittest.TestCase):
                 ),
         })
 
+  def test_build_batch_models_with_template_syntax(self):
+    dummy_impl = def_types.ModelImplementation(
+        name="TEST",
+        tags=["fp32"],
+        framework_type=def_types.ModelFrameworkType.JAX,
+        module_path=f"test.model",
+        source_info="")
+    template = utils.ModelTemplate(
+        name=utils.BATCH_NAME("TEST_MODEL"),
+        tags=[],
+        model_impl=dummy_impl,
+        model_parameters={},
+        artifacts_dir_url=string.Template("test/$$/$name/${batch_size}x"),
+    )
+
+    models = utils.build_batch_models(template=template, batch_sizes=[3])
+
+    self.assertEqual(models[3].artifacts_dir_url, "test/$/TEST_MODEL_BATCH3/3x")
+
   def test_build_batch_benchmark_cases(self):
     dummy_impl = def_types.ModelImplementation(
         name="TEST",
@@ -14,6 +14,7 @@ import numpy as np
 import pathlib
 import requests
 import tarfile
+import threading
 from typing import Any, Dict, List, Sequence, Tuple
 
 
@@ -23,6 +24,19 @@ class BenchmarkResult:
   metrics: Dict[str, Any]
 
 
+# requests doesn't clearly state that its session is thread-safe. Each thread
+# keeps its own session so connections are reused across downloads.
+_thread_local = threading.local()
+
+
+def _get_session() -> requests.Session:
+  session = getattr(_thread_local, "session", None)
+  if session is None:
+    session = requests.Session()
+    _thread_local.session = session
+  return session
+
+
 def download_file(source_url: str,
                   save_path: pathlib.Path,
                   unpack: bool = True,
@@ -44,9 +58,7 @@ def download_file(source_url: str,
   if verbose:
     print(f"Downloading '{source_url}' to '{save_path}'.")
 
-  # requests doesn't clearly state that its session is thread-safe. In order to
-  # download in parallel, don't use session here.
-  with requests.get(source_url, stream=True) as response:
+  with _get_session().get(source_url, stream=True) as response:
     if not response.ok:
       raise ValueError(f"Failed to download '{source_url}'."
                        f" Error: '{response.status_code} - {response.text}'")
@@ -7,132 +7,280 @@
 # SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
 
 import argparse
+import contextlib
 import dataclasses
+from dataclasses import dataclass
+import hashlib
 import json
+import mmap
+import numpy as np
 import os
 import pathlib
 import re
-import statistics
+import shutil
+import sqlite3
 import subprocess
 import sys
-from typing import Any, Dict, List, Sequence
+import tempfile
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
-# Add common_benchmark_suite dir to the search path.
-sys.path.insert(
-    0, str(pathlib.Path(__file__).parents[2] / "common_benchmark_suite"))
-# Add comparative_benchmark dir to the search path.
-sys.path.insert(
-    0, str(pathlib.Path(__file__).parents[2] / "comparative_benchmark"))
+# Add comparative_benchmark and common_benchmark_suite dirs to the search path.
+_REPO_ROOT = pathlib.Path(__file__).parents[2]
+sys.path[:0] = [
+    str(_REPO_ROOT / "comparative_benchmark"),
+    str(_REPO_ROOT / "common_benchmark_suite"),
+]
 
 from openxla.benchmark import def_types, devices
 import openxla.benchmark.comparative_suite.jax.benchmark_definitions as jax_benchmark_definitions
 import openxla.benchmark.comparative_suite.tf.benchmark_definitions as tf_benchmark_definitions
 import utils
 
+try:
+  import orjson
+except ImportError:
+  orjson = None
+
 ALL_DEVICE_NAMES = [device.name for device in devices.ALL_DEVICES]
 
+ALL_BENCHMARKS = (jax_benchmark_definitions.ALL_BENCHMARKS +
+                  tf_benchmark_definitions.ALL_BENCHMARKS)
+# Benchmarks indexed by their names. A name can be shared by more than one
+# benchmark, so each name maps to a list.
+BENCHMARKS_BY_NAME: Dict[str, List[def_types.BenchmarkCase]] = {}
+for _benchmark in ALL_BENCHMARKS:
+  BENCHMARKS_BY_NAME.setdefault(_benchmark.name, []).append(_benchmark)
+
 COMPILER_XLA = "xla"
 COMPILER_XLA_CPU_NEXT = "xla_cpu_next"
 
 TIME_UNITS = {"us": 1e-3, "ms": 1, "s": 1e3, "min": 60 * 1e3, "h": 3600 * 1e3}
-TIME_REGEXP = re.compile(r"time: (\d+\.?\d*) (%s)" % "|".join(TIME_UNITS))
-SIZE_REGEXP = re.compile(r" (\d+) bytes")
-LOG_TIME_REGEXP = re.compile(
-    r"^(\d{4}-\d{2}-\d{2}) (\d{2}):(\d{2}):(\d{2}\.\d+):")
-
-GPU_COMPILE_TIME_REGEXP = re.compile(
-    r"NVPTXCompiler::CompileTargetBinary - CompileToPtx.*")
-GPU_PEAK_MEMORY_REGEXP = re.compile(
-    r"New Peak memory usage of \d+ bytes for GPU")
-GPU_LATENCY_START_REGEXP = re.compile(r".+HloRunner: ExecuteOnDevices started")
-GPU_LATENCY_STOP_REGEXP = re.compile(r".+HloRunner: ExecuteOnDevices succeeded")
-
-CPU_COMPILE_TIME_REGEXP = re.compile(r"... compiled and ran in (.*)s.")
-CPU_LATENCY_REGEXP = re.compile(r"execution time for runner [A-Za-z]*: (.*)s.")
+TIME_REGEXP = re.compile(
+    (r"time: (\d+\.?\d*) (%s)" % "|".join(TIME_UNITS)).encode("ascii"))
+SIZE_REGEXP = re.compile(rb" (\d+) bytes")
+MICROSECONDS_PER_DAY = 86400 * 1000000
+
+# Matches all the GPU log lines we are interested in with a single pattern. The
+# name of the matched group tells which kind of record the line is. The groups
+# are placed after the literal prefixes, otherwise the regex engine can't skip
+# ahead to the candidate positions and becomes several times slower.
+GPU_LOG_REGEXP = re.compile(
+    rb"HloRunner: ExecuteOnDevices "
+    rb"(?:(?P<latency_start>started)|(?P<latency_stop>succeeded))|"
+    rb"NVPTXCompiler::CompileTargetBinary - (?P<compile_time>CompileToPtx)|"
+    rb"New Peak memory usage of \d+ bytes for (?P<peak_memory>GPU)")
+
+# Timings are logged under VLOG so we need to enable this for the modules we are
+# interested in. The compiler and allocator logs are verbose, so they are only
+# enabled in a separate single-iteration run.
+GPU_COMPILE_LOG_ENV_VARS = {
+    "TF_CPP_MIN_LOG_LEVEL":
+        "0",
+    "TF_CPP_VMODULE":
+        "nvptx_compiler=1,gpu_compiler=1,parse_flags_from_env=1,bfc_allocator=2",
+}
+GPU_LATENCY_LOG_ENV_VARS = {
+    "TF_CPP_MIN_LOG_LEVEL": "0",
+    "TF_CPP_VMODULE": "functional_hlo_runner=1",
+}
+
+CPU_COMPILE_TIME_REGEXP = re.compile(rb"... compiled and ran in (.*)s.")
+CPU_LATENCY_REGEXP = re.compile(rb"execution time for runner [A-Za-z]*: (.*)s.")
 
 HLO_FILENAME = "xla_hlo_before_optimizations.txt"
 
-
-def _parse_log_time(line: str) -> float:
-  """Parses timestamp from the standard log."""
-  match = LOG_TIME_REGEXP.search(line)
-  assert match, "Unable to parse log time: %s" % line
-  _, h, m, s = match.groups()
-  return 1000 * (int(h) * 3600 + int(m) * 60 + float(s))
-
-
-def _parse_log_elapsed_time(line1: str, line2: str) -> float:
-  """Calculates elapsed time between two log lines."""
-  start, end = _parse_log_time(line1), _parse_log_time(line2)
-  end += 86400 if end < start else 0  # next day correction
-  return end - start
-
-
-def _parse_gpu_latencies(raw_output: str,
+# Max number of HLO dumps to download in parallel.
+MAX_DOWNLOAD_WORKERS = 16
+# Dir under the root dir to cache the downloaded HLO dumps.
+CACHE_DIR_NAME = "_cache"
+# File under the root dir to cache the benchmark metrics.
+RESULTS_CACHE_FILENAME = "_results_cache.sqlite"
+
+# Size of the chunks to read files.
+FILE_READ_CHUNK_SIZE = 1 << 20
+# Number of trailing output lines kept to report benchmark errors.
+ERROR_OUTPUT_TAIL_LINES = 100
+
+
+@dataclass
+class _GpuLogRecords:
+  """Records extracted from XLA GPU logs."""
+  latencies_us: List[int] = dataclasses.field(default_factory=list)
+  # Number of start or stop logs without a counterpart.
+  unpaired_latency_logs: int = 0
+  compile_times_ms: List[float] = dataclasses.field(default_factory=list)
+  peak_memory_mb: Optional[float] = None
+
+
+def _parse_log_time(line: bytes) -> int:
+  """Parses timestamp in microseconds from the standard log.
+
+  Log lines start with `YYYY-MM-DD HH:MM:SS.ffffff:`, so the fields are read
+  from their fixed offsets instead of searching with a regex.
+  """
+  seconds_end = line.find(b":", 20)
+  separators = (line[4:5] + line[7:8] + line[10:11] + line[13:14] +
+                line[16:17] + line[19:20])
+  fields = (line[0:4], line[5:7], line[8:10], line[11:13], line[14:16],
+            line[17:19], line[20:seconds_end])
+  assert (seconds_end > 20 and separators == b"-- ::." and
+          all(field.isdigit() for field in fields)
+         ), "Unable to parse log time: %s" % line
+  h, m, s, fraction = fields[3:]
+
+  # Pad or truncate the fraction of second to microseconds.
+  us = int(fraction[:6].ljust(6, b"0"))
+  return ((int(h) * 60 + int(m)) * 60 + int(s)) * 1000000 + us
+
+
+def _parse_log_elapsed_time(start: int, end: int) -> int:
+  """Calculates elapsed microseconds between two log timestamps."""
+  # The modulo corrects the end time logged on the next day.
+  return (end - start) % MICROSECONDS_PER_DAY
+
+
+def _parse_gpu_latencies(records: _GpuLogRecords,
                          expected_iterations: int) -> List[float]:
   """Returns a list of latencies in milliseconds parsed from XLA logs."""
-  start_matches = GPU_LATENCY_START_REGEXP.findall(raw_output)
-  stop_matches = GPU_LATENCY_STOP_REGEXP.findall(raw_output)
-
-  if len(start_matches) != len(stop_matches):
+  if records.unpaired_latency_logs:
     print(
-        f"Error: Unequal number of start and stop logs. {len(start_matches)} start logs != {len(stop_matches)} stop logs."
+        f"Error: Found {records.unpaired_latency_logs} start or stop logs without a counterpart."
     )
     return []
 
-  if len(start_matches) != expected_iterations:
+  if len(records.latencies_us) != expected_iterations:
     print(
-        f"Error: Number of iterations not equal to the number of expected iteration. Expected {expected_iterations}. Found {len(start_matches)}."
+        f"Error: Number of iterations not equal to the number of expected iteration. Expected {expected_iterations}. Found {len(records.latencies_us)}."
     )
     return []
 
-  latencies = [
-      _parse_log_elapsed_time(t1, t2)
-      for t1, t2 in zip(start_matches, stop_matches)
-  ]
-  return latencies
+  return [latency_us / 1000 for latency_us in records.latencies_us]
 
 
-def _parse_log_duration(time_str: str) -> float:
+def _parse_log_duration(line: bytes) -> float:
   """Returns the time in milliseconds parsed from XLA logs."""
-  match = TIME_REGEXP.search(time_str)
+  match = TIME_REGEXP.search(line)
   assert match, "Unable to parse the time on log line"
-  exp = TIME_UNITS[match.group(2)]
+  exp = TIME_UNITS[match.group(2).decode("ascii")]
   return float(match.group(1)) * exp
 
 
-def _parse_log_size(size_str: str) -> float:
-  """Returns the size in bytes parsed from XLA logs."""
-  match = SIZE_REGEXP.search(size_str)
+def _parse_log_size(line: bytes) -> float:
+  """Returns the size in megabytes parsed from XLA logs."""
+  match = SIZE_REGEXP.search(line)
   assert match, "Unable to parse the size on log line"
   return float(match.group(1)) * 1e-6
 
 
-def _parse_gpu_compile_time_ms(raw_output: str) -> float:
-  matches = GPU_COMPILE_TIME_REGEXP.findall(raw_output)
-  total_compile_time_ms = sum([_parse_log_duration(t1) for t1 in matches])
-  return total_compile_time_ms
-
-
-def _parse_gpu_peak_memory(raw_output: str) -> float:
-  matches = GPU_PEAK_MEMORY_REGEXP.findall(raw_output)
-  if matches:
-    return _parse_log_size(matches[-1])
-  print(f"Unable to find peak memory from output {str}")
-  return 0
+@contextlib.contextmanager
+def _run_and_map_output(cmd: Sequence[Any],
+                        env: Optional[Dict[str, str]] = None
+                       ) -> Iterator[Union[bytes, mmap.mmap]]:
+  """Runs `cmd` and maps its stdout and stderr into memory.
+
+  The outputs are written to a temporary file instead of a pipe, so regexes can
+  run over the mapped file without copying the outputs into the process.
+  """
+  with tempfile.TemporaryFile() as output_file:
+    subprocess.run(cmd, stdout=output_file, stderr=subprocess.STDOUT, env=env)
+    # Empty files can't be mapped.
+    if os.fstat(output_file.fileno()).st_size == 0:
+      yield b""
+      return
+    with mmap.mmap(output_file.fileno(), 0, access=mmap.ACCESS_READ) as output:
+      yield output
+
+
+def _find_matched_lines(
+    output: Union[bytes, mmap.mmap],
+    pattern: re.Pattern) -> Iterator[Tuple[re.Match, bytes]]:
+  """Yields each match of `pattern` in the output with its whole line."""
+  for match in pattern.finditer(output):
+    line_start = output.rfind(b"\n", 0, match.start()) + 1
+    line_end = output.find(b"\n", match.end())
+    if line_end < 0:
+      line_end = len(output)
+    yield match, output[line_start:line_end]
+
+
+def _get_output_tail(output: Union[bytes, mmap.mmap], num_lines: int) -> str:
+  """Returns the last lines of the output."""
+  tail_start = len(output)
+  # Don't count the newline ending the output.
+  if output[-1:] == b"\n":
+    tail_start -= 1
+  for _ in range(num_lines):
+    tail_start = output.rfind(b"\n", 0, tail_start)
+    if tail_start < 0:
+      break
+  return output[tail_start + 1:].decode("utf-8", errors="replace")
+
+
+def _parse_gpu_log(output: Union[bytes, mmap.mmap]) -> _GpuLogRecords:
+  """Extracts records from XLA GPU logs in a single pass."""
+  records = _GpuLogRecords()
+  # Start time of the iteration waiting for its stop log.
+  start_time_us = None
+  for match, line in _find_matched_lines(output, GPU_LOG_REGEXP):
+    kind = match.lastgroup
+    if kind == "latency_start":
+      if start_time_us is not None:
+        records.unpaired_latency_logs += 1
+      start_time_us = _parse_log_time(line)
+    elif kind == "latency_stop":
+      if start_time_us is None:
+        records.unpaired_latency_logs += 1
+      else:
+        records.latencies_us.append(
+            _parse_log_elapsed_time(start_time_us, _parse_log_time(line)))
+        start_time_us = None
+    elif kind == "compile_time":
+      records.compile_times_ms.append(_parse_log_duration(line))
+    elif kind == "peak_memory":
+      records.peak_memory_mb = _parse_log_size(line)
+
+  if start_time_us is not None:
+    records.unpaired_latency_logs += 1
+
+  return records
+
+
+def _compute_latency_stats(latencies: List[float]) -> Dict[str, Any]:
+  """Returns the statistics of latencies in milliseconds."""
+  if not latencies:
+    return {
+        "min_latency_ms": None,
+        "max_latency_ms": None,
+        "mean_latency_ms": None,
+        "median_latency_ms": None,
+        "stddev_latency_ms": None,
+    }
+
+  latencies_ms = np.fromiter(latencies, dtype=np.float64, count=len(latencies))
+  return {
+      "min_latency_ms": float(latencies_ms.min()),
+      "max_latency_ms": float(latencies_ms.max()),
+      "mean_latency_ms": float(latencies_ms.mean()),
+      "median_latency_ms": float(np.median(latencies_ms)),
+      # Sample standard deviation needs at least two latencies.
+      "stddev_latency_ms":
+          float(latencies_ms.std(ddof=1)) if len(latencies) > 1 else None,
+  }
 
 
-def _run_compiler_benchmark_gpu(
+def _run_gpu_tool(
     hlo_benchmark_tool_path: pathlib.Path,
     hlo_input_path: pathlib.Path,
-    benchmark_iterations: int,
+    num_repeats: int,
+    log_env_vars: Dict[str, str],
     verbose: bool,
-) -> Dict[str, Any]:
+) -> _GpuLogRecords:
+  """Runs the HLO runner with the logging env vars and parses its logs."""
   cmd = [
       hlo_benchmark_tool_path,
       f"--hlo_file={hlo_input_path}",
       f"--device_type=gpu",
-      f"--num_repeats={benchmark_iterations}",
+      f"--num_repeats={num_repeats}",
       "--input_format=text",
       "--num_replicas=1",
       "--num_partitions=1",
@@ -140,31 +288,42 @@ def _run_compiler_benchmark_gpu(
   ]
   if verbose:
     print(f"Run command: {cmd}")
-  result = subprocess.run(
-      cmd,
-      stdout=subprocess.PIPE,
-      stderr=subprocess.STDOUT,
-      # Timings are logged under VLOG so we need to enable this for the modules
-      # we are interested in.
-      env={
-          "TF_CPP_MIN_LOG_LEVEL":
-              "0",
-          "TF_CPP_VMODULE":
-              "nvptx_compiler=1,gpu_compiler=1,parse_flags_from_env=1,bfc_allocator=2,functional_hlo_runner=1",
-      })
-  result_text = result.stdout.decode("utf-8")
-
-  latencies = _parse_gpu_latencies(result_text, benchmark_iterations)
-  compile_time_ms = _parse_gpu_compile_time_ms(result_text)
-  peak_memory_usage = _parse_gpu_peak_memory(result_text)
+  # Keep the parent environment so the tool can still find CUDA libraries.
+  with _run_and_map_output(cmd, env={**os.environ, **log_env_vars}) as output:
+    return _parse_gpu_log(output)
+
+
+def _run_compiler_benchmark_gpu(
+    hlo_benchmark_tool_path: pathlib.Path,
+    hlo_input_path: pathlib.Path,
+    benchmark_iterations: int,
+    verbose: bool,
+) -> Dict[str, Any]:
+  # Measure compile time and peak memory with a single iteration so the verbose
+  # logs don't grow with the benchmark iterations.
+  compile_records = _run_gpu_tool(
+      hlo_benchmark_tool_path=hlo_benchmark_tool_path,
+      hlo_input_path=hlo_input_path,
+      num_repeats=1,
+      log_env_vars=GPU_COMPILE_LOG_ENV_VARS,
+      verbose=verbose)
+  latency_records = _run_gpu_tool(
+      hlo_benchmark_tool_path=hlo_benchmark_tool_path,
+      hlo_input_path=hlo_input_path,
+      num_repeats=benchmark_iterations,
+      log_env_vars=GPU_LATENCY_LOG_ENV_VARS,
+      verbose=verbose)
+
+  latencies = _parse_gpu_latencies(latency_records, benchmark_iterations)
+  compile_time_ms = sum(compile_records.compile_times_ms)
+  peak_memory_usage = compile_records.peak_memory_mb
+  if peak_memory_usage is None:
+    print("Unable to find peak memory from output")
+    peak_memory_usage = 0
 
   results_dict = {
       "compile_time_ms": compile_time_ms,
-      "min_latency_ms": min(latencies, default=None),
-      "max_latency_ms": max(latencies, default=None),
-      "mean_latency_ms": statistics.mean(latencies) if latencies else None,
-      "median_latency_ms": statistics.median(latencies) if latencies else None,
-      "stddev_latency_ms": statistics.stdev(latencies) if latencies else None,
+      **_compute_latency_stats(latencies),
       "benchmark_iterations": benchmark_iterations,
       "device_memory_peak_mb": peak_memory_usage,
   }
@@ -188,36 +347,106 @@ def _run_compiler_benchmark_cpu(
   ]
   if verbose:
     print(f'Run command: {" ".join(cmd)}')
-  result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-  result_text = result.stdout.decode("utf-8")
+  with _run_and_map_output(cmd) as output:
+    compile_time_matches = CPU_COMPILE_TIME_REGEXP.findall(output)
+    latency_matches = CPU_LATENCY_REGEXP.findall(output)
+    if len(latency_matches) != benchmark_iterations:
+      output_tail = _get_output_tail(output, ERROR_OUTPUT_TAIL_LINES)
 
-  matches = CPU_COMPILE_TIME_REGEXP.findall(result_text)
   # Take the first iteration compile-time latency. Profiles show that this is
   # where tuning and other initialization occurs. Subsequent calls to compile
   # in the same process will reuse these results.
-  compile_time_latency = float(matches[0]) if matches else None
+  compile_time_latency = float(
+      compile_time_matches[0]) if compile_time_matches else None
 
-  matches = CPU_LATENCY_REGEXP.findall(result_text)
-  if len(matches) == benchmark_iterations:
-    latencies = [float(match) * 1000 for match in matches]
+  if len(latency_matches) == benchmark_iterations:
+    latencies = [float(match) * 1000 for match in latency_matches]
   else:
-    error_string = f"Expected to find {benchmark_iterations} latencies but found {len(matches)} instead:\n{result_text}"
+    error_string = f"Expected to find {benchmark_iterations} latencies but found {len(latency_matches)} instead:\n{output_tail}"
     if verbose:
       print(error_string)
     return {"error": error_string}
 
   results_dict = {
       "compile_time_s": compile_time_latency,
-      "min_latency_ms": min(latencies, default=None),
-      "max_latency_ms": max(latencies, default=None),
-      "mean_latency_ms": statistics.mean(latencies) if latencies else None,
-      "median_latency_ms": statistics.median(latencies) if latencies else None,
-      "stddev_latency_ms": statistics.stdev(latencies) if latencies else None,
+      **_compute_latency_stats(latencies),
       "benchmark_iterations": benchmark_iterations,
   }
   return results_dict
 
 
+def _hash_file(path: pathlib.Path) -> str:
+  """Returns the SHA-256 hex digest of the file content."""
+  sha256 = hashlib.sha256()
+  with open(path, "rb") as f:
+    for chunk in iter(lambda: f.read(FILE_READ_CHUNK_SIZE), b""):
+      sha256.update(chunk)
+  return sha256.hexdigest()
+
+
+class _ResultsCache:
+  """SQLite cache of benchmark metrics.
+
+  Metrics are keyed on the hashes of the HLO tool and dump, the iterations, the
+  compiler, the device and the `XLA_FLAGS` the tool runs with, so reruns with
+  the same inputs return instantly.
+  """
+
+  def __init__(self, db_path: pathlib.Path, hlo_tool: pathlib.Path):
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    self._connection = sqlite3.connect(db_path)
+    self._connection.execute("CREATE TABLE IF NOT EXISTS results"
+                             " (key TEXT PRIMARY KEY, metrics TEXT)")
+    self._hlo_tool_hash = _hash_file(hlo_tool)
+
+  def build_key(self, hlo_dump: pathlib.Path, iterations: int, compiler: str,
+                device_name: str, xla_flags: str) -> str:
+    return json.dumps([
+        self._hlo_tool_hash,
+        _hash_file(hlo_dump),
+        iterations,
+        compiler,
+        device_name,
+        xla_flags,
+    ])
+
+  def get(self, key: str) -> Optional[Dict[str, Any]]:
+    row = self._connection.execute(
+        "SELECT metrics FROM results WHERE key = ?", (key,)).fetchone()
+    return None if row is None else json.loads(row[0])
+
+  def put(self, key: str, metrics: Dict[str, Any]):
+    with self._connection:
+      self._connection.execute(
+          "INSERT OR REPLACE INTO results (key, metrics) VALUES (?, ?)",
+          (key, json.dumps(metrics)))
+
+  def close(self):
+    self._connection.close()
+
+
+def _run_compiler_benchmark(
+    target_device: def_types.DeviceSpec,
+    iterations: int,
+    hlo_tool: pathlib.Path,
+    hlo_dump: pathlib.Path,
+    verbose: bool,
+) -> Dict[str, Any]:
+  # We use different binaries for benchmarking gpu and cpu.
+  accelerator = target_device.accelerator_type
+  if accelerator == "gpu":
+    return _run_compiler_benchmark_gpu(hlo_benchmark_tool_path=hlo_tool,
+                                       hlo_input_path=hlo_dump,
+                                       benchmark_iterations=iterations,
+                                       verbose=verbose)
+  if accelerator == "cpu":
+    return _run_compiler_benchmark_cpu(hlo_benchmark_tool_path=hlo_tool,
+                                       hlo_input_path=hlo_dump,
+                                       benchmark_iterations=iterations,
+                                       verbose=verbose)
+  raise ValueError(f"Unsupported accelerator: '{accelerator}'.")
+
+
 def _run(
     benchmark: def_types.BenchmarkCase,
     target_device: def_types.DeviceSpec,
@@ -225,6 +454,7 @@ def _run(
     iterations: int,
     hlo_tool: pathlib.Path,
     hlo_dump: pathlib.Path,
+    results_cache: Optional[_ResultsCache],
     verbose: bool,
 ) -> utils.BenchmarkResult:
   model = benchmark.model
@@ -243,20 +473,30 @@ def _run(
   if compiler == COMPILER_XLA_CPU_NEXT:
     os.environ['XLA_FLAGS'] = "--xla_cpu_use_xla_runtime"
 
-  # We use different binaries for benchmarking gpu and cpu.
-  accelerator = target_device.accelerator_type
-  if accelerator == "gpu":
-    metrics = _run_compiler_benchmark_gpu(hlo_benchmark_tool_path=hlo_tool,
-                                          hlo_input_path=hlo_dump,
-                                          benchmark_iterations=iterations,
-                                          verbose=verbose)
-  elif accelerator == "cpu":
-    metrics = _run_compiler_benchmark_cpu(hlo_benchmark_tool_path=hlo_tool,
-                                          hlo_input_path=hlo_dump,
-                                          benchmark_iterations=iterations,
-                                          verbose=verbose)
-  else:
-    raise ValueError(f"Unsupported accelerator: '{accelerator}'.")
+  cache_key = None
+  metrics = None
+  if results_cache is not None:
+    # The tool inherits XLA_FLAGS, including the one set for the compiler above.
+    xla_flags = os.environ.get("XLA_FLAGS", "")
+    cache_key = results_cache.build_key(hlo_dump=hlo_dump,
+                                        iterations=iterations,
+                                        compiler=compiler,
+                                        device_name=target_device.name,
+                                        xla_flags=xla_flags)
+    metrics = results_cache.get(cache_key)
+    if metrics is not None and verbose:
+      print(f"Use cached metrics of '{benchmark.name}'.")
+
+  if metrics is None:
+    metrics = _run_compiler_benchmark(target_device=target_device,
+                                      iterations=iterations,
+                                      hlo_tool=hlo_tool,
+                                      hlo_dump=hlo_dump,
+                                      verbose=verbose)
+    # Don't cache failed runs.
+    if (cache_key is not None and "error" not in metrics and
+        metrics["mean_latency_ms"] is not None):
+      results_cache.put(cache_key, metrics)
 
   return utils.BenchmarkResult(
       definition=benchmark_definition,
@@ -266,12 +506,31 @@ def _run(
   )
 
 
+def _dump_result(result: utils.BenchmarkResult) -> str:
+  """Returns the result as indented JSON for verbose logs.
+
+  orjson is used when installed. Unlike the json fallback, it writes non-ASCII
+  characters unescaped and NaN as `null`, which is fine for logs but is why it
+  isn't used to write the results file.
+  """
+  if orjson is not None:
+    # orjson serializes dataclasses directly without copying them into dicts.
+    return orjson.dumps(result, option=orjson.OPT_INDENT_2).decode("utf-8")
+  return json.dumps(dataclasses.asdict(result), indent=2)
+
+
 def _download_artifacts(benchmarks: Sequence[def_types.BenchmarkCase],
                         root_dir: pathlib.Path,
                         verbose: bool = False):
-  """Download benchmark artifacts."""
+  """Download benchmark artifacts.
+
+  HLO dumps are cached at `<root_dir>/_cache/<sha256 of source URL>/` and
+  linked into the model dirs, so each URL is only downloaded once.
+  """
 
+  cache_dir = root_dir / CACHE_DIR_NAME
   download_list = []
+  link_list = []
   for benchmark in benchmarks:
     model = benchmark.model
     if (model.artifacts_dir_url is None or
@@ -280,9 +539,30 @@ def _download_artifacts(benchmarks: Sequence[def_types.BenchmarkCase],
       raise ValueError(f"XLA HLO dump isn't provided by '{model.name}'.")
     model_url = model.artifacts_dir_url + "/" + HLO_FILENAME
     model_path = root_dir / model.name / HLO_FILENAME
-    download_list.append((model_url, model_path))
-
-  utils.download_files(download_list, verbose=verbose)
+    url_hash = hashlib.sha256(model_url.encode("utf-8")).hexdigest()
+    cache_path = cache_dir / url_hash / HLO_FILENAME
+    link_list.append((cache_path, model_path))
+
+    partial_path = cache_path.with_name(HLO_FILENAME + ".partial")
+    if (not cache_path.exists() and
+        (model_url, partial_path) not in download_list):
+      download_list.append((model_url, partial_path))
+
+  # Download to partial files first so interrupted downloads aren't cached.
+  utils.download_files(download_list,
+                       max_workers=MAX_DOWNLOAD_WORKERS,
+                       verbose=verbose)
+  for _, partial_path in download_list:
+    partial_path.replace(partial_path.with_name(HLO_FILENAME))
+
+  for cache_path, model_path in link_list:
+    model_path.parent.mkdir(parents=True, exist_ok=True)
+    model_path.unlink(missing_ok=True)
+    try:
+      os.link(cache_path, model_path)
+    except OSError:
+      # Hard links might not be supported, e.g. across file systems.
+      shutil.copyfile(cache_path, model_path)
 
 
 def _parse_arguments() -> argparse.Namespace:
@@ -328,6 +608,14 @@ def _parse_arguments() -> argparse.Namespace:
                       "--no_download",
                       action="store_true",
                       help="Don't automatically download benchmark artifacts.")
+  parser.add_argument(
+      "--cache-results",
+      "--cache_results",
+      action="store_true",
+      help="Reuse the metrics of previous runs with the same HLO tool, HLO"
+      " dump, iterations, compiler, device and XLA_FLAGS. The metrics are"
+      " cached in"
+      f" `<root-dir>/{RESULTS_CACHE_FILENAME}`.")
   parser.add_argument("--verbose",
                       action="store_true",
                       help="Show verbose messages.")
@@ -344,18 +632,23 @@ def main(
     hlo_tool: pathlib.Path,
     iterations: int,
     no_download: bool,
+    cache_results: bool,
     verbose: bool,
 ):
-  name_pattern = re.compile(f"^{benchmark_name}$")
-  all_benchmarks = jax_benchmark_definitions.ALL_BENCHMARKS + tf_benchmark_definitions.ALL_BENCHMARKS
-  benchmarks = [
-      benchmark for benchmark in all_benchmarks
-      if name_pattern.match(benchmark.name)
-  ]
+  if re.escape(benchmark_name) == benchmark_name:
+    # The name has no special characters, so look it up directly instead of
+    # matching it against every benchmark.
+    benchmarks = BENCHMARKS_BY_NAME.get(benchmark_name, [])
+  else:
+    name_pattern = re.compile(f"^{benchmark_name}$")
+    benchmarks = [
+        benchmark for benchmark in ALL_BENCHMARKS
+        if name_pattern.match(benchmark.name)
+    ]
 
   if not benchmarks:
     all_benchmark_names = "\n".join(
-        benchmark.name for benchmark in all_benchmarks)
+        benchmark.name for benchmark in ALL_BENCHMARKS)
     raise ValueError(f'No benchmark matches "{benchmark_name}".'
                      f' Available benchmarks:\n{all_benchmark_names}')
 
@@ -371,22 +664,40 @@ def main(
                         root_dir=root_dir,
                         verbose=verbose)
 
-  for benchmark in benchmarks:
-    hlo_dump = root_dir / benchmark.model.name / HLO_FILENAME
+  benchmark_hlo_dumps = [
+      (benchmark, root_dir / benchmark.model.name / HLO_FILENAME)
+      for benchmark in benchmarks
+  ]
+  # Check all HLO dumps before running any benchmark so a missing one doesn't
+  # fail the job halfway.
+  for _, hlo_dump in benchmark_hlo_dumps:
     if not hlo_dump.exists():
       raise ValueError(f"HLO dump not found: '{hlo_dump}'.")
 
-    result = _run(benchmark=benchmark,
-                  target_device=target_device,
-                  compiler=compiler,
-                  iterations=iterations,
-                  hlo_tool=hlo_tool,
-                  hlo_dump=hlo_dump,
-                  verbose=verbose)
-    if verbose:
-      print(json.dumps(dataclasses.asdict(result), indent=2))
+  results_cache = None
+  if cache_results:
+    results_cache = _ResultsCache(db_path=root_dir / RESULTS_CACHE_FILENAME,
+                                  hlo_tool=hlo_tool)
 
-    utils.append_benchmark_result(output, result)
+  try:
+    for benchmark, hlo_dump in benchmark_hlo_dumps:
+      result = _run(benchmark=benchmark,
+                    target_device=target_device,
+                    compiler=compiler,
+                    iterations=iterations,
+                    hlo_tool=hlo_tool,
+                    hlo_dump=hlo_dump,
+                    results_cache=results_cache,
+                    verbose=verbose)
+      if verbose:
+        print(_dump_result(result))
+
+      # Save each result as soon as it finishes, so the finished benchmarks
+      # aren't lost if the job is killed.
+      utils.append_benchmark_result(output, result)
+  finally:
+    if results_cache is not None:
+      results_cache.close()
 
 
 if __name__ == "__main__":
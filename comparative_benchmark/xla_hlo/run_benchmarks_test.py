@@ -0,0 +1,267 @@
+# Copyright 2023 The OpenXLA Authors
+#
+# Licensed under the Apache License v2.0 with LLVM Exceptions.
+# See https://llvm.org/LICENSE.txt for license information.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+
+import os
+import pathlib
+import tempfile
+from typing import List, Tuple
+import unittest
+from unittest import mock
+
+# Import run_benchmarks first, it adds the benchmark suite to the search path.
+import run_benchmarks
+from openxla.benchmark import def_types, devices
+
+
+def _build_benchmark(name: str,
+                     artifacts_dir_url: str) -> def_types.BenchmarkCase:
+  model = def_types.Model(
+      name=name,
+      tags=["test"],
+      model_impl=def_types.ModelImplementation(
+          name="TEST",
+          tags=[],
+          framework_type=def_types.ModelFrameworkType.JAX),
+      model_parameters={
+          "batch_size": 1,
+          "data_type": "fp32",
+      },
+      artifacts_dir_url=artifacts_dir_url,
+      exported_model_types=[def_types.ModelArtifactType.XLA_HLO_DUMP])
+  return def_types.BenchmarkCase(
+      name=name,
+      model=model,
+      input_data=def_types.ModelTestData(name="TEST_DATA", source_url=""))
+
+
+def _fake_download_files(urls_to_paths: List[Tuple[str, pathlib.Path]],
+                         **kwargs):
+  for source_url, save_path in urls_to_paths:
+    save_path.parent.mkdir(parents=True, exist_ok=True)
+    save_path.write_text(source_url)
+
+
+class RunBenchmarksTest(unittest.TestCase):
+
+  def _run_with_cache(self, results_cache: run_benchmarks._ResultsCache,
+                      hlo_dump: pathlib.Path) -> dict:
+    result = run_benchmarks._run(
+        benchmark=_build_benchmark("MODEL_A", "https://example.com/a"),
+        target_device=devices.ALL_DEVICES[0],
+        compiler=run_benchmarks.COMPILER_XLA,
+        iterations=10,
+        hlo_tool=pathlib.Path("hlo_tool"),
+        hlo_dump=hlo_dump,
+        results_cache=results_cache,
+        verbose=False)
+    return result.metrics["compiler_level"]
+
+  def test_parse_log_time(self):
+    self.assertEqual(
+        run_benchmarks._parse_log_time(
+            b"2023-06-20 01:02:03.366413: I runner.cc:1] HloRunner"),
+        ((1 * 60 + 2) * 60 + 3) * 1000000 + 366413)
+
+  def test_parse_log_time_pad_fraction(self):
+    self.assertEqual(
+        run_benchmarks._parse_log_time(b"2023-06-20 00:00:00.3: I x.cc:1]"),
+        300000)
+
+  def test_parse_log_time_truncate_fraction(self):
+    self.assertEqual(
+        run_benchmarks._parse_log_time(
+            b"2023-06-20 00:00:00.366413123: I x.cc:1]"), 366413)
+
+  def test_parse_log_time_invalid_line(self):
+    self.assertRaises(
+        AssertionError, lambda: run_benchmarks._parse_log_time(
+            b"XXXXXXXXXX 2a:3b:0c.1: HloRunner"))
+
+  def test_parse_log_elapsed_time_next_day(self):
+    start = run_benchmarks._parse_log_time(b"2023-06-20 23:59:59.999: I")
+    end = run_benchmarks._parse_log_time(b"2023-06-21 00:00:00.001: I")
+
+    self.assertEqual(run_benchmarks._parse_log_elapsed_time(start, end), 2000)
+
+  def test_parse_gpu_log(self):
+    output = (
+        b"2023-06-20 10:00:00.100000: I nvptx_compiler.cc:1]"
+        b" NVPTXCompiler::CompileTargetBinary - CompileToPtx time: 1.5 s\n"
+        b"2023-06-20 10:00:00.100000: I nvptx_compiler.cc:1]"
+        b" NVPTXCompiler::CompileTargetBinary - CompileToPtx time: 250 ms\n"
+        b"2023-06-20 10:00:00.200000: I bfc_allocator.cc:1]"
+        b" New Peak memory usage of 1000000 bytes for GPU 0\n"
+        b"2023-06-20 10:00:00.300000: I bfc_allocator.cc:1]"
+        b" New Peak memory usage of 3000000 bytes for GPU 0\n"
+        b"2023-06-20 10:00:01.000000: I functional_hlo_runner.cc:1]"
+        b" HloRunner: ExecuteOnDevices started\n"
+        b"2023-06-20 10:00:01.002500: I functional_hlo_runner.cc:1]"
+        b" HloRunner: ExecuteOnDevices succeeded\n"
+        b"2023-06-20 10:00:02.000000: I functional_hlo_runner.cc:1]"
+        b" HloRunner: ExecuteOnDevices started\n"
+        b"2023-06-20 10:00:02.001000: I functional_hlo_runner.cc:1]"
+        b" HloRunner: ExecuteOnDevices succeeded")
+
+    records = run_benchmarks._parse_gpu_log(output)
+
+    self.assertEqual(
+        records,
+        run_benchmarks._GpuLogRecords(latencies_us=[2500, 1000],
+                                      unpaired_latency_logs=0,
+                                      compile_times_ms=[1500, 250],
+                                      peak_memory_mb=3))
+
+  def test_parse_gpu_log_unpaired_logs(self):
+    output = (b"2023-06-20 10:00:00.000000: I x.cc:1]"
+              b" HloRunner: ExecuteOnDevices succeeded\n"
+              b"2023-06-20 10:00:01.000000: I x.cc:1]"
+              b" HloRunner: ExecuteOnDevices started\n"
+              b"2023-06-20 10:00:02.000000: I x.cc:1]"
+              b" HloRunner: ExecuteOnDevices started\n"
+              b"2023-06-20 10:00:02.001000: I x.cc:1]"
+              b" HloRunner: ExecuteOnDevices succeeded\n"
+              b"2023-06-20 10:00:03.000000: I x.cc:1]"
+              b" HloRunner: ExecuteOnDevices started\n")
+
+    records = run_benchmarks._parse_gpu_log(output)
+
+    self.assertEqual(records.latencies_us, [1000])
+    self.assertEqual(records.unpaired_latency_logs, 3)
+    self.assertEqual(run_benchmarks._parse_gpu_latencies(records, 1), [])
+
+  def test_download_artifacts_share_url(self):
+    benchmarks = [
+        _build_benchmark("MODEL_A", "https://example.com/shared"),
+        _build_benchmark("MODEL_B", "https://example.com/shared"),
+    ]
+    with tempfile.TemporaryDirectory() as temp_dir, mock.patch.object(
+        run_benchmarks.utils,
+        "download_files",
+        side_effect=_fake_download_files) as download_files:
+      root_dir = pathlib.Path(temp_dir)
+
+      run_benchmarks._download_artifacts(benchmarks=benchmarks,
+                                         root_dir=root_dir)
+
+      download_list = download_files.call_args.args[0]
+      self.assertEqual([url for url, _ in download_list], [
+          f"https://example.com/shared/{run_benchmarks.HLO_FILENAME}",
+      ])
+      model_a_path = root_dir / "MODEL_A" / run_benchmarks.HLO_FILENAME
+      model_b_path = root_dir / "MODEL_B" / run_benchmarks.HLO_FILENAME
+      self.assertEqual(model_a_path.read_text(), download_list[0][0])
+      self.assertTrue(model_a_path.samefile(model_b_path))
+
+  def test_download_artifacts_cache_hit(self):
+    benchmarks = [_build_benchmark("MODEL_A", "https://example.com/a")]
+    with tempfile.TemporaryDirectory() as temp_dir, mock.patch.object(
+        run_benchmarks.utils,
+        "download_files",
+        side_effect=_fake_download_files) as download_files:
+      root_dir = pathlib.Path(temp_dir)
+      run_benchmarks._download_artifacts(benchmarks=benchmarks,
+                                         root_dir=root_dir)
+      model_path = root_dir / "MODEL_A" / run_benchmarks.HLO_FILENAME
+      model_path.unlink()
+
+      run_benchmarks._download_artifacts(benchmarks=benchmarks,
+                                         root_dir=root_dir)
+
+      self.assertEqual(download_files.call_args.args[0], [])
+      self.assertTrue(model_path.exists())
+
+  def test_download_artifacts_failed_download_not_cached(self):
+    benchmarks = [
+        _build_benchmark("MODEL_A", "https://example.com/a"),
+        _build_benchmark("MODEL_B", "https://example.com/b"),
+    ]
+
+    def download_files(urls_to_paths, **kwargs):
+      # Only the first download succeeds.
+      _fake_download_files(urls_to_paths[:1])
+      raise ValueError("Failed to download.")
+
+    with tempfile.TemporaryDirectory() as temp_dir, mock.patch.object(
+        run_benchmarks.utils, "download_files", side_effect=download_files):
+      root_dir = pathlib.Path(temp_dir)
+
+      self.assertRaises(
+          ValueError, lambda: run_benchmarks._download_artifacts(
+              benchmarks=benchmarks, root_dir=root_dir))
+
+      cache_dir = root_dir / run_benchmarks.CACHE_DIR_NAME
+      self.assertEqual(
+          list(cache_dir.glob(f"*/{run_benchmarks.HLO_FILENAME}")), [])
+
+  def test_download_artifacts_copy_without_hard_link(self):
+    benchmarks = [_build_benchmark("MODEL_A", "https://example.com/a")]
+    with tempfile.TemporaryDirectory() as temp_dir, mock.patch.object(
+        run_benchmarks.utils,
+        "download_files",
+        side_effect=_fake_download_files), mock.patch.object(
+            run_benchmarks.os, "link", side_effect=OSError):
+      root_dir = pathlib.Path(temp_dir)
+
+      run_benchmarks._download_artifacts(benchmarks=benchmarks,
+                                         root_dir=root_dir)
+
+      model_path = root_dir / "MODEL_A" / run_benchmarks.HLO_FILENAME
+      self.assertEqual(model_path.read_text(),
+                       f"https://example.com/a/{run_benchmarks.HLO_FILENAME}")
+      self.assertEqual(os.stat(model_path).st_nlink, 1)
+
+  def test_run_with_results_cache(self):
+    metrics = {"mean_latency_ms": 1.0}
+    with tempfile.TemporaryDirectory() as temp_dir, mock.patch.dict(
+        os.environ, {"XLA_FLAGS": ""}), mock.patch.object(
+            run_benchmarks, "_run_compiler_benchmark",
+            return_value=metrics) as run_compiler_benchmark:
+      temp_dir = pathlib.Path(temp_dir)
+      hlo_tool = temp_dir / "hlo_tool"
+      hlo_tool.write_text("tool")
+      hlo_dump = temp_dir / "hlo_dump"
+      hlo_dump.write_text("dump")
+      results_cache = run_benchmarks._ResultsCache(
+          db_path=temp_dir / run_benchmarks.RESULTS_CACHE_FILENAME,
+          hlo_tool=hlo_tool)
+
+      miss_metrics = self._run_with_cache(results_cache, hlo_dump)
+      hit_metrics = self._run_with_cache(results_cache, hlo_dump)
+      os.environ["XLA_FLAGS"] = "--xla_gpu_autotune_level=0"
+      self._run_with_cache(results_cache, hlo_dump)
+      results_cache.close()
+
+      self.assertEqual(miss_metrics, metrics)
+      self.assertEqual(hit_metrics, metrics)
+      # The run with different XLA_FLAGS doesn't hit the cache.
+      self.assertEqual(run_compiler_benchmark.call_count, 2)
+
+  def test_run_with_results_cache_skip_failed_runs(self):
+    for failed_metrics in [{"error": "failed"}, {"mean_latency_ms": None}]:
+      with self.subTest(failed_metrics=failed_metrics):
+        with tempfile.TemporaryDirectory() as temp_dir, mock.patch.object(
+            run_benchmarks,
+            "_run_compiler_benchmark",
+            return_value=failed_metrics) as run_compiler_benchmark:
+          temp_dir = pathlib.Path(temp_dir)
+          hlo_tool = temp_dir / "hlo_tool"
+          hlo_tool.write_text("tool")
+          hlo_dump = temp_dir / "hlo_dump"
+          hlo_dump.write_text("dump")
+          results_cache = run_benchmarks._ResultsCache(
+              db_path=temp_dir / run_benchmarks.RESULTS_CACHE_FILENAME,
+              hlo_tool=hlo_tool)
+
+          self._run_with_cache(results_cache, hlo_dump)
+          rerun_metrics = self._run_with_cache(results_cache, hlo_dump)
+          results_cache.close()
+
+          self.assertEqual(rerun_metrics, failed_metrics)
+          self.assertEqual(run_compiler_benchmark.call_count, 2)
+
+
+if __name__ == "__main__":
+  unittest.main()